@@ -1,35 +1,140 @@
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, Response, current_app, request, session
 from flask_socketio import SocketIO, emit, join_room, leave_room
 from src.models.user import db, User
 from src.models.conversation import Conversation, Message, Intent
 from src.services.nlp_engine import NLPEngine
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import asyncio
+import functools
+import os
+import queue
+import threading
+import time
 import uuid
 from datetime import datetime
 import json
 
+try:
+    import orjson
+except ImportError:
+    # Optional speedup; stdlib json is used instead
+    orjson = None
+
 chatbot_bp = Blueprint('chatbot', __name__)
 
-# Initialize NLP Engine
-nlp_engine = NLPEngine()
+
+def ojson(payload, status=200):
+    """Build a JSON response, serializing with orjson when available"""
+    if orjson is not None:
+        body = orjson.dumps(payload)
+    else:
+        body = json.dumps(payload)
+    return Response(body, status=status, mimetype='application/json')
+
+# Shared NLP engine, created on first use so blueprint import (and
+# therefore Flask boot) doesn't block on NLTK setup
+_nlp_engine = None
+_nlp_engine_lock = threading.Lock()
+
+
+def get_nlp_engine():
+    """Return the module singleton NLPEngine, constructing it lazily"""
+    global _nlp_engine
+    if _nlp_engine is None:
+        with _nlp_engine_lock:
+            if _nlp_engine is None:
+                _nlp_engine = NLPEngine()
+    return _nlp_engine
+
+
+# Pool for running NLP concurrently with the DB work of a request
+NLP_POOL = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+
+class BatchedNLP:
+    """Collect concurrent messages into small batches for the NLP engine.
+
+    Messages arriving within a short window are drained together and run
+    through NLPEngine.process_batch, amortizing per-call overhead under
+    bursty WebSocket traffic. Each submit returns a Future resolved by
+    the background worker.
+    """
+
+    def __init__(self, engine_factory, max_batch=32, max_wait=0.005):
+        self.engine_factory = engine_factory
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, user_message):
+        future = Future()
+        self._queue.put((user_message, future))
+        return future
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(items) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                results = self.engine_factory().process_batch([msg for msg, _ in items])
+            except Exception as e:
+                for _, future in items:
+                    future.set_exception(e)
+                continue
+            for (_, future), result in zip(items, results):
+                future.set_result(result)
+
+
+# Batching layer for WebSocket traffic
+batched_nlp = BatchedNLP(get_nlp_engine)
+
+
+@functools.lru_cache(maxsize=1)
+def _iso_second(epoch_second):
+    return datetime.utcfromtimestamp(epoch_second).isoformat()
+
+
+def _now_iso():
+    """ISO timestamp for response payloads, cached at 1-second resolution"""
+    return _iso_second(int(time.time()))
+
+
+def _new_session_id():
+    """Random session id without the uuid dash formatting"""
+    return uuid.uuid4().hex
 
 # WebSocket events will be registered in main.py
 
 @chatbot_bp.route('/chat', methods=['POST'])
-def chat():
+async def chat():
     """Handle chat messages via REST API"""
     try:
         data = request.get_json()
         
         if not data or 'message' not in data:
-            return jsonify({'error': 'Message is required'}), 400
+            return ojson({'error': 'Message is required'}, status=400)
         
         user_message = data['message'].strip()
-        session_id = data.get('session_id', str(uuid.uuid4()))
+        session_id = data.get('session_id', _new_session_id())
         user_id = data.get('user_id', 1)  # Default user for demo
         
         if not user_message:
-            return jsonify({'error': 'Message cannot be empty'}), 400
+            return ojson({'error': 'Message cannot be empty'}, status=400)
         
+        # Kick off NLP on the pool so it overlaps with the conversation
+        # lookup and user-message insert below
+        nlp_future = NLP_POOL.submit(get_nlp_engine().process_message, user_message)
+
         # Get or create conversation
         conversation = Conversation.query.filter_by(session_id=session_id).first()
         if not conversation:
@@ -39,8 +144,10 @@ def chat():
                 status='active'
             )
             db.session.add(conversation)
-            db.session.commit()
-        
+            # Flush (not commit) to materialize conversation.id so both
+            # messages land in the same transaction
+            db.session.flush()
+
         # Save user message
         user_msg = Message(
             conversation_id=conversation.id,
@@ -48,13 +155,15 @@ def chat():
             content=user_message
         )
         db.session.add(user_msg)
-        
-        # Process message with NLP engine
-        nlp_result = nlp_engine.process_message(user_message)
-        
+        db.session.flush()
+
+        # Await the NLP work without pinning the thread once the insert
+        # is staged
+        nlp_result = await asyncio.wrap_future(nlp_future)
+
         # Generate bot response
         bot_response = nlp_result['response']
-        
+
         # Save bot message
         bot_msg = Message(
             conversation_id=conversation.id,
@@ -64,9 +173,11 @@ def chat():
             confidence=nlp_result['confidence']
         )
         db.session.add(bot_msg)
+
+        # Single commit closes the transaction for the exchange
         db.session.commit()
-        
-        return jsonify({
+
+        return ojson({
             'session_id': session_id,
             'user_message': user_message,
             'bot_response': bot_response,
@@ -74,11 +185,11 @@ def chat():
             'confidence': nlp_result['confidence'],
             'entities': nlp_result['entities'],
             'sentiment': nlp_result['sentiment'],
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': _now_iso()
         })
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ojson({'error': str(e)}, status=500)
 
 @chatbot_bp.route('/conversations', methods=['GET'])
 def get_conversations():
@@ -86,38 +197,63 @@ def get_conversations():
     try:
         user_id = request.args.get('user_id', 1, type=int)
         
-        conversations = Conversation.query.filter_by(user_id=user_id).order_by(
+        # Aggregate message counts in SQL so each conversation's messages
+        # aren't lazily loaded just to count them (N+1 pattern)
+        conversations = db.session.query(
+            Conversation, db.func.count(Message.id)
+        ).outerjoin(Message).filter(
+            Conversation.user_id == user_id
+        ).group_by(Conversation.id).order_by(
             Conversation.started_at.desc()
         ).all()
-        
-        return jsonify({
-            'conversations': [conv.to_dict() for conv in conversations]
+
+        return ojson({
+            'conversations': [
+                conv.to_dict(message_count=count) for conv, count in conversations
+            ]
         })
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ojson({'error': str(e)}, status=500)
 
 @chatbot_bp.route('/conversations/<session_id>/messages', methods=['GET'])
 def get_conversation_messages(session_id):
-    """Get all messages for a specific conversation"""
+    """Get messages for a conversation, paginated newest-page-first"""
     try:
         conversation = Conversation.query.filter_by(session_id=session_id).first()
-        
+
         if not conversation:
-            return jsonify({'error': 'Conversation not found'}), 404
-        
-        messages = Message.query.filter_by(conversation_id=conversation.id).order_by(
-            Message.timestamp.asc()
-        ).all()
-        
-        return jsonify({
+            return ojson({'error': 'Conversation not found'}, status=404)
+
+        # Keyset pagination: fetch the `limit` messages before
+        # `before_id` so memory stays bounded however long the
+        # conversation is. Clients walk older pages via next_before_id.
+        limit = max(min(request.args.get('limit', 100, type=int), 500), 1)
+        before_id = request.args.get('before_id', type=int)
+
+        # COUNT in SQL; to_dict's fallback would lazy-load every row
+        message_count = db.session.query(db.func.count(Message.id)).filter(
+            Message.conversation_id == conversation.id
+        ).scalar()
+
+        query = Message.query.filter_by(conversation_id=conversation.id)
+        if before_id is not None:
+            query = query.filter(Message.id < before_id)
+        messages = query.order_by(Message.id.desc()).limit(limit).all()
+
+        # Oldest-first within the page, matching the previous ordering
+        messages.reverse()
+        next_before_id = messages[0].id if len(messages) == limit else None
+
+        return ojson({
             'session_id': session_id,
-            'conversation': conversation.to_dict(),
-            'messages': [msg.to_dict() for msg in messages]
+            'conversation': conversation.to_dict(message_count=message_count),
+            'messages': [msg.to_dict() for msg in messages],
+            'next_before_id': next_before_id
         })
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ojson({'error': str(e)}, status=500)
 
 @chatbot_bp.route('/conversations/<session_id>', methods=['DELETE'])
 def delete_conversation(session_id):
@@ -126,23 +262,71 @@ def delete_conversation(session_id):
         conversation = Conversation.query.filter_by(session_id=session_id).first()
         
         if not conversation:
-            return jsonify({'error': 'Conversation not found'}), 404
+            return ojson({'error': 'Conversation not found'}, status=404)
         
         # Delete all messages (cascade should handle this)
         db.session.delete(conversation)
         db.session.commit()
         
-        return jsonify({'message': 'Conversation deleted successfully'})
+        return ojson({'message': 'Conversation deleted successfully'})
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ojson({'error': str(e)}, status=500)
+
+# Environ flag stamped on every internally dispatched batch operation
+_BATCH_DISPATCH_ENV = 'chatbot.batch_dispatch'
+
+@chatbot_bp.route('/batch', methods=['POST'])
+def batch():
+    """Execute several API operations in a single round-trip"""
+    try:
+        # Operations dispatched below carry the environ flag, so a
+        # nested batch call is rejected here no matter how its URL is
+        # spelled (absolute, host-prefixed, missing slash, ...) — each
+        # level could otherwise fan out into 20 more dispatches
+        if request.environ.get(_BATCH_DISPATCH_ENV):
+            return ojson({'error': 'Batch operations cannot target /api/batch'}, status=400)
+
+        operations = request.get_json()
+
+        if not isinstance(operations, list) or not operations:
+            return ojson({'error': 'Request body must be a list of operations'}, status=400)
+
+        if len(operations) > 20:
+            return ojson({'error': 'Too many operations (max 20)'}, status=400)
+
+        # Dispatch each operation through the internal test client so it
+        # goes through the normal routing/validation without a new
+        # network round-trip
+        client = current_app.test_client()
+        responses = []
+        for operation in operations:
+            method = operation.get('method', 'GET').upper()
+            url = operation.get('url', '')
+            result = client.open(
+                url,
+                method=method,
+                json=operation.get('body'),
+                environ_overrides={_BATCH_DISPATCH_ENV: True}
+            )
+            responses.append({
+                'method': method,
+                'url': url,
+                'status': result.status_code,
+                'body': result.get_json(silent=True)
+            })
+
+        return ojson({'responses': responses})
+
+    except Exception as e:
+        return ojson({'error': str(e)}, status=500)
 
 @chatbot_bp.route('/intents', methods=['GET'])
 def get_intents():
     """Get all available intents"""
     try:
-        intents = nlp_engine.intents
-        return jsonify({
+        intents = get_nlp_engine().intents
+        return ojson({
             'intents': {
                 name: {
                     'patterns': data['patterns'][:3],  # Show first 3 patterns
@@ -154,7 +338,7 @@ def get_intents():
         })
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ojson({'error': str(e)}, status=500)
 
 @chatbot_bp.route('/analytics', methods=['GET'])
 def get_analytics():
@@ -162,50 +346,45 @@ def get_analytics():
     try:
         user_id = request.args.get('user_id', 1, type=int)
         
-        # Total conversations
-        total_conversations = Conversation.query.filter_by(user_id=user_id).count()
-        
-        # Total messages
-        total_messages = db.session.query(Message).join(Conversation).filter(
+        # Conversation count, message count, and average confidence in a
+        # single aggregated query; the conditional AVG only considers
+        # user messages (AVG skips the NULLs the CASE yields for bots)
+        total_conversations, total_messages, avg_confidence = db.session.query(
+            db.func.count(db.distinct(Conversation.id)),
+            db.func.count(Message.id),
+            db.func.avg(db.case((Message.sender == 'user', Message.confidence)))
+        ).outerjoin(Message).filter(
             Conversation.user_id == user_id
-        ).count()
-        
-        # Intent distribution
+        ).one()
+
+        # Intent distribution (returns one row per intent)
         intent_stats = db.session.query(
-            Message.intent, 
+            Message.intent,
             db.func.count(Message.id).label('count')
         ).join(Conversation).filter(
             Conversation.user_id == user_id,
             Message.sender == 'user',
             Message.intent.isnot(None)
         ).group_by(Message.intent).all()
-        
-        # Average confidence
-        avg_confidence = db.session.query(
-            db.func.avg(Message.confidence)
-        ).join(Conversation).filter(
-            Conversation.user_id == user_id,
-            Message.sender == 'user',
-            Message.confidence.isnot(None)
-        ).scalar()
-        
-        return jsonify({
+
+        return ojson({
             'total_conversations': total_conversations,
             'total_messages': total_messages,
             'intent_distribution': {
                 intent: count for intent, count in intent_stats
             },
             'average_confidence': float(avg_confidence) if avg_confidence else 0.0,
+            'nlp_cache': get_nlp_engine().cache_info()._asdict(),
             'user_id': user_id
         })
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ojson({'error': str(e)}, status=500)
 
 # WebSocket event handlers (to be registered in main.py)
 def handle_connect(auth):
     """Handle client connection"""
-    session_id = request.args.get('session_id', str(uuid.uuid4()))
+    session_id = request.args.get('session_id', _new_session_id())
     join_room(session_id)
     emit('connected', {
         'session_id': session_id,
@@ -220,16 +399,17 @@ def handle_message(data):
     """Handle incoming WebSocket message"""
     try:
         user_message = data.get('message', '').strip()
-        session_id = data.get('session_id', str(uuid.uuid4()))
+        session_id = data.get('session_id', _new_session_id())
         user_id = data.get('user_id', 1)
         
         if not user_message:
             emit('error', {'message': 'Message cannot be empty'})
             return
         
-        # Emit typing indicator
-        emit('typing', {'typing': True}, room=session_id)
-        
+        # Submit to the batching layer so concurrent WebSocket messages
+        # share one NLP pass; overlaps with the DB work below
+        nlp_future = batched_nlp.submit(user_message)
+
         # Get or create conversation
         conversation = Conversation.query.filter_by(session_id=session_id).first()
         if not conversation:
@@ -239,8 +419,10 @@ def handle_message(data):
                 status='active'
             )
             db.session.add(conversation)
-            db.session.commit()
-        
+            # Flush (not commit) to materialize conversation.id so both
+            # messages land in the same transaction
+            db.session.flush()
+
         # Save user message
         user_msg = Message(
             conversation_id=conversation.id,
@@ -248,13 +430,21 @@ def handle_message(data):
             content=user_message
         )
         db.session.add(user_msg)
-        
-        # Process message with NLP engine
-        nlp_result = nlp_engine.process_message(user_message)
-        
+        db.session.flush()
+
+        # Only broadcast the typing indicator when NLP actually takes a
+        # while; for fast responses both typing emits are skipped
+        typing_shown = False
+        try:
+            nlp_result = nlp_future.result(timeout=0.05)
+        except FutureTimeoutError:
+            emit('typing', {'typing': True}, room=session_id)
+            typing_shown = True
+            nlp_result = nlp_future.result()
+
         # Generate bot response
         bot_response = nlp_result['response']
-        
+
         # Save bot message
         bot_msg = Message(
             conversation_id=conversation.id,
@@ -264,13 +454,17 @@ def handle_message(data):
             confidence=nlp_result['confidence']
         )
         db.session.add(bot_msg)
+
+        # Single commit closes the transaction for the exchange
         db.session.commit()
-        
+
         # Stop typing indicator
-        emit('typing', {'typing': False}, room=session_id)
-        
-        # Send response
-        emit('message', {
+        if typing_shown:
+            emit('typing', {'typing': False}, room=session_id)
+
+        # Build the payload once; the room broadcast reuses the same
+        # prepared frame for every recipient
+        payload = {
             'session_id': session_id,
             'user_message': user_message,
             'bot_response': bot_response,
@@ -278,8 +472,9 @@ def handle_message(data):
             'confidence': nlp_result['confidence'],
             'entities': nlp_result['entities'],
             'sentiment': nlp_result['sentiment'],
-            'timestamp': datetime.utcnow().isoformat()
-        }, room=session_id)
+            'timestamp': _now_iso()
+        }
+        emit('message', payload, room=session_id)
         
     except Exception as e:
         emit('error', {'message': str(e)})
@@ -6,16 +6,20 @@ class Conversation(db.Model):
     __tablename__ = 'conversations'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    session_id = db.Column(db.String(100), nullable=False, unique=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    session_id = db.Column(db.String(100), nullable=False, unique=True, index=True)
     started_at = db.Column(db.DateTime, default=datetime.utcnow)
     ended_at = db.Column(db.DateTime)
-    status = db.Column(db.String(20), default='active')
+    status = db.Column(db.String(20), default='active', index=True)
     
     # Relationship with messages
     messages = db.relationship('Message', backref='conversation', lazy=True, cascade='all, delete-orphan')
     
-    def to_dict(self):
+    def to_dict(self, message_count=None):
+        # Callers that already know the count (e.g. from an aggregated
+        # query) pass it in to avoid lazy-loading every message row
+        if message_count is None:
+            message_count = len(self.messages)
         return {
             'id': self.id,
             'user_id': self.user_id,
@@ -23,19 +27,26 @@ class Conversation(db.Model):
             'started_at': self.started_at.isoformat() if self.started_at else None,
             'ended_at': self.ended_at.isoformat() if self.ended_at else None,
             'status': self.status,
-            'message_count': len(self.messages)
+            'message_count': message_count
         }
 
 class Message(db.Model):
     __tablename__ = 'messages'
     
     id = db.Column(db.Integer, primary_key=True)
-    conversation_id = db.Column(db.Integer, db.ForeignKey('conversations.id'), nullable=False)
-    sender = db.Column(db.String(10), nullable=False)  # 'user' or 'bot'
+    conversation_id = db.Column(db.Integer, db.ForeignKey('conversations.id'), nullable=False, index=True)
+    sender = db.Column(db.String(10), nullable=False, index=True)  # 'user' or 'bot'
     content = db.Column(db.Text, nullable=False)
-    intent = db.Column(db.String(50))
+    intent = db.Column(db.String(50), index=True)
     confidence = db.Column(db.Float)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    # Composite indexes for the message-history ordering and the
+    # analytics group-by, which filter on several columns at once
+    __table_args__ = (
+        db.Index('ix_msg_conv_ts', 'conversation_id', 'timestamp'),
+        db.Index('ix_msg_conv_sender_intent', 'conversation_id', 'sender', 'intent'),
+    )
     
     def to_dict(self):
         return {
@@ -5,6 +5,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from flask import Flask, send_from_directory
 from flask_socketio import SocketIO
+from sqlalchemy import event
 from flask_cors import CORS
 from src.models.user import db, User
 from src.routes.user import user_bp
@@ -15,8 +16,15 @@ app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
 # Enable CORS for all routes
 CORS(app, origins="*")
 
-# Initialize SocketIO
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
+# Initialize SocketIO. Point SOCKETIO_MESSAGE_QUEUE at a Redis URL
+# (e.g. redis://localhost:6379/0) so multiple workers share rooms and
+# broadcasts fan out through one backplane instead of per-process loops
+socketio = SocketIO(
+    app,
+    cors_allowed_origins="*",
+    async_mode='threading',
+    message_queue=os.environ.get('SOCKETIO_MESSAGE_QUEUE')
+)
 
 # Database configuration
 app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
@@ -35,6 +43,13 @@ app.register_blueprint(chatbot_bp, url_prefix='/api')
 with app.app_context():
     db.create_all()
 
+    # WAL journaling lets readers proceed while a chat commit is in flight
+    @event.listens_for(db.engine, 'connect')
+    def set_sqlite_pragma(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.close()
+
 # Register WebSocket event handlers
 @socketio.on('connect')
 def on_connect(auth):
